@@ -1,16 +1,26 @@
-from rpi_rf import RFDevice
-import time
-from machine import Pin
-
-Button = Pin(14, Pin.IN, Pin.PULL_UP)
-
-RF_TX = 6
-code = 255
-rfdevice = RFDevice(RF_TX,1)
-rfdevice.enable_tx()
-
-while True:
-    if (not(Button.value())):
-        rfdevice.tx_code(code)
-
-#rfdevice.cleanup()
+from rpi_rf import RFDevice
+import machine
+from machine import Pin
+
+Button = Pin(14, Pin.IN, Pin.PULL_UP)
+
+RF_TX = 6
+code = 255
+rfdevice = RFDevice(RF_TX,1)
+rfdevice.enable_tx()
+
+# one press = one send, sleep instead of busy-polling the button
+tx_flag = bytearray(1)
+
+def on_press(pin):
+    tx_flag[0] = 1
+
+Button.irq(trigger=Pin.IRQ_FALLING, handler=on_press)
+
+while True:
+    machine.lightsleep()
+    if tx_flag[0]:
+        tx_flag[0] = 0
+        rfdevice.tx_code(code)
+
+#rfdevice.cleanup()
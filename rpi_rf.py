@@ -1,259 +1,415 @@
-"""
-Sending and receiving 433/315Mhz signals with low-cost GPIO RF Modules on a Raspberry Pi.
-"""
-
-import utime
-from collections import namedtuple
-
-from machine import Pin
-
-MAX_CHANGES = 67
-
-"""Pulse parameters, values in usec"""
-THRESHOLD_SYNC = 15000
-THRESHOLD_TICK = 300
-SCALE_TIME_US = 3
-
-Debug1 = Pin(16, Pin.OUT)
-Debug2 = Pin(17, Pin.OUT)
-
-Protocol = namedtuple('Protocol',
-                      ['pulselength',
-                       'sync_high', 'sync_low',
-                       'zero_high', 'zero_low',
-                       'one_high', 'one_low'])
-PROTOCOLS = (None,
-             Protocol(350, 1, 31, 1, 3, 3, 1),
-             Protocol(650, 1, 10, 1, 2, 2, 1),
-             Protocol(100, 30, 71, 4, 11, 9, 6),
-             Protocol(380, 1, 6, 1, 3, 3, 1),
-             Protocol(500, 6, 14, 1, 2, 2, 1),
-             Protocol(200, 1, 10, 1, 5, 1, 1))
-
-class RFDevice:
-    """Representation of a GPIO RF device."""
-
-    # pylint: disable=too-many-instance-attributes,too-many-arguments
-    def __init__(self, gpio,
-                 tx_proto=1, tx_pulselength=None, tx_repeat=10, tx_length=24, rx_tolerance=70):
-        """Initialize the RF device."""
-        self.gpio = gpio
-        self.tx_enabled = False
-        self.tx_proto = tx_proto
-        if tx_pulselength:
-            self.tx_pulselength = tx_pulselength
-        else:
-            self.tx_pulselength = PROTOCOLS[tx_proto].pulselength
-        self.tx_repeat = tx_repeat
-        self.tx_length = tx_length
-        self.rx_enabled = False
-        self.rx_tolerance = rx_tolerance
-        # internal values
-        self._rx_timings = [0] * (MAX_CHANGES + 1)
-        self._rx_last_timestamp = 0
-        self._rx_change_count = 0
-        self._rx_repeat_count = 0
-        # successful RX values
-        self.rx_code = None
-        self.rx_code_timestamp = None
-        self.rx_proto = tx_proto
-        self.rx_repeat = tx_repeat
-        self.rx_bitlength = None
-        self.rx_pulselength = None
-
-        print("Using GPIO " + str(gpio))
-
-    def cleanup(self):
-        """Disable TX and RX and clean up GPIO."""
-        if self.tx_enabled:
-            self.disable_tx()
-        if self.rx_enabled:
-            self.disable_rx()
-        print("Cleanup pin")
-        Pin(self.gpio, Pin.IN, Pin.PULL_DOWN)
-
-    def enable_tx(self):
-        """Enable TX, set up GPIO."""
-        if self.rx_enabled:
-            print("RX is enabled, not enabling TX")
-            return False
-        if not self.tx_enabled:
-            self.tx_enabled = True
-            print(self.gpio)
-            self.tx_pin = Pin(self.gpio, Pin.OUT)
-            print("TX enabled")
-        return True
-
-    def disable_tx(self):
-        """Disable TX, reset GPIO."""
-        if self.tx_enabled:
-            # set up GPIO pin as input for safety
-            self.tx_pin = Pin(self.gpio, Pin.IN, Pin.PULL_DOWN)
-            self.tx_enabled = False
-            print("TX disabled")
-        return True
-
-    def tx_code(self, code):
-        """
-        Send a decimal code.
-        
-        """
-        rawcode = '0'*(self.tx_length + 0 - len(bin(code)[2:])) + bin(code)[2:]
-        
-        if self.tx_proto == 6:
-            nexacode = ""
-            for b in rawcode:
-                if b == '0':
-                    nexacode = nexacode + "01"
-                if b == '1':
-                    nexacode = nexacode + "10"
-            rawcode = nexacode
-            self.tx_length = 64
-        
-        print("TX code: " + str(code))
-        return self.tx_bin(rawcode)
-
-    def tx_bin(self, rawcode):
-        """Send a binary code."""
-        print("TX bin: " + str(rawcode))
-        for _ in range(0, self.tx_repeat):
-            if self.tx_proto == 6:
-                if not self.tx_sync():
-                    return False
-            for byte in range(0, self.tx_length):
-                if rawcode[byte] == '0':
-                    if not self.tx_l0():
-                        return False
-                else:
-                    if not self.tx_l1():
-                        return False
-            if not self.tx_sync():
-                return False
-
-        return True
-
-    def tx_l0(self):
-        """Send a '0' bit."""
-        if not 0 < self.tx_proto < len(PROTOCOLS):
-            print("Unknown TX protocol")
-            return False
-        return self.tx_waveform(PROTOCOLS[self.tx_proto].zero_high,
-                                PROTOCOLS[self.tx_proto].zero_low)
-
-    def tx_l1(self):
-        """Send a '1' bit."""
-        if not 0 < self.tx_proto < len(PROTOCOLS):
-            print("Unknown TX protocol")
-            return False
-        return self.tx_waveform(PROTOCOLS[self.tx_proto].one_high,
-                                PROTOCOLS[self.tx_proto].one_low)
-
-    def tx_sync(self):
-        """Send a sync."""
-        if not 0 < self.tx_proto < len(PROTOCOLS):
-            print("Unknown TX protocol")
-            return False
-        return self.tx_waveform(PROTOCOLS[self.tx_proto].sync_high,
-                                PROTOCOLS[self.tx_proto].sync_low)
-
-    def tx_waveform(self, highpulses, lowpulses):
-        """Send basic waveform."""
-        if not self.tx_enabled:
-            print("TX is not enabled, not sending data")
-            return False
-        #print(highpulses,lowpulses)
-        #print("Pulse lenth unit time [us]:", self.tx_pulselength * SCALE_TIME_US)
-        self.tx_pin.high()
-        self._sleep((highpulses * self.tx_pulselength * SCALE_TIME_US))
-        self.tx_pin.low()
-        self._sleep((lowpulses * self.tx_pulselength * SCALE_TIME_US))
-        return True
-    
-    def enable_rx(self):
-        """Enable RX, set up GPIO and add event detection."""
-        if self.tx_enabled:
-            print("TX is enabled, not enabling RX")
-            return False
-        if not self.rx_enabled:
-            self.rx_enabled = True
-            self.rx_pin = Pin(self.gpio, Pin.IN, Pin.PULL_DOWN)
-            self.rx_pin.irq(trigger=Pin.IRQ_FALLING|Pin.IRQ_RISING, handler=self.rx_callback)
-            print("RX enabled")
-        return True
-
-    def disable_rx(self):
-        """Disable RX, remove GPIO event detection."""
-        if self.rx_enabled:
-            self.rx_pin.irq(handler=None)
-            self.rx_enabled = False
-            print("RX disabled")
-        return True
-    
-    def received_rx(self):
-        code = self.rx_code 
-        if self.rx_code:
-            self.rx_code = None
-        return code
-
-    def rx_callback(self, rx_pin):
-        """RX callback for GPIO event detection. Handle basic signal detection."""
-        timestamp = int(utime.ticks_us())
-        duration = timestamp - self._rx_last_timestamp
-        
-        """Ignoring pulses shorter than THRESHOLD_TICK""" 
-        if duration > THRESHOLD_TICK:
-            Debug1.toggle()
-            """Synchronizing to a pulse longer than THRESHOLD_SYNC"""
-            if duration > THRESHOLD_SYNC:
-                Debug2.toggle()
-                self._rx_repeat_count += 1
-                self._rx_change_count -= 1
-                
-                if self._rx_change_count > 1:
-                
-                    #print("Changes:", self._rx_change_count)
-                    #print("Buffer:", self._rx_timings)
-                    #print("Trunc:", self._rx_timings[0:self._rx_change_count])
-                
-                    #if self._rx_waveform(self.rx_proto, self._rx_change_count, timestamp):
-                    #    print("RX code " + str(self.rx_code))
-                    self._rx_waveform(self.rx_proto, self._rx_change_count, timestamp)
-
-                self._rx_change_count = 0
-
-            if self._rx_change_count >= MAX_CHANGES:
-                self._rx_change_count = 0
-                self._rx_repeat_count = 0
-                
-            self._rx_timings[self._rx_change_count] = duration
-            self._rx_change_count += 1
-
-        self._rx_last_timestamp = timestamp
-
-    def _rx_waveform(self, pnum, change_count, timestamp):
-        """Detect waveform and format code."""
-        code = 0
-        delay = int(self._rx_timings[0] / PROTOCOLS[pnum].sync_low)
-        #print("Defined pulsewidth", delay)
-        delay_tolerance = delay * self.rx_tolerance / 100
-
-        for i in range(1, change_count, 2):
-            if (abs(self._rx_timings[i] - delay * PROTOCOLS[pnum].zero_high) < delay_tolerance and
-                abs(self._rx_timings[i+1] - delay * PROTOCOLS[pnum].zero_low) < delay_tolerance):
-                code <<= 1
-            elif (abs(self._rx_timings[i] - delay * PROTOCOLS[pnum].one_high) < delay_tolerance and
-                  abs(self._rx_timings[i+1] - delay * PROTOCOLS[pnum].one_low) < delay_tolerance):
-                code <<= 1
-                code |= 1
-            else:
-                return False
-
-        if self._rx_change_count > 6 and code != 0:
-            self.rx_code = code
-            self.rx_code_timestamp = timestamp
-            return True
-
-        return False
-
-    def _sleep(self, delay):     
-        utime.sleep_us(delay)
+"""
+Sending and receiving 433/315Mhz signals with low-cost GPIO RF Modules on a Raspberry Pi.
+"""
+
+import utime
+from array import array
+
+import machine
+import micropython
+import rp2
+from machine import Pin
+from micropython import const
+
+"""Status prints block for milliseconds on USB-CDC, keep them off the hot path"""
+_DEBUG = const(0)
+
+MAX_CHANGES = const(67)
+
+"""Edge timing ring buffer, power of two so the ISR wraps with a mask"""
+_RX_RING_SIZE = const(256)
+_RX_RING_MASK = const(255)
+
+"""Pulse parameters, values in usec"""
+THRESHOLD_SYNC = const(15000)
+THRESHOLD_TICK = const(300)
+SCALE_TIME_US = const(3)
+
+"""Report tracebacks from the edge ISR without allocating inside it"""
+micropython.alloc_emergency_exception_buf(100)
+
+"""Edge/sync scope markers on the Debug pins, toggled with one register
+write when enabled, dead-stripped from the ISR when const 0"""
+_DEBUG_RX = const(0)
+Debug1 = Pin(16, Pin.OUT)
+Debug2 = Pin(17, Pin.OUT)
+_DEBUG1_MASK = const(1 << 16)
+_DEBUG2_MASK = const(1 << 17)
+_SIO_GPIO_OUT_XOR = const(0xd000001c)
+
+"""Flat protocol table, _PROTO_FIELDS uint16 per protocol, slot 0 unused.
+Fields: pulselength, sync_high, sync_low, zero_high, zero_low, one_high, one_low"""
+_PULSELEN = const(0)
+_SYNC_HIGH = const(1)
+_SYNC_LOW = const(2)
+_ZERO_HIGH = const(3)
+_ZERO_LOW = const(4)
+_ONE_HIGH = const(5)
+_ONE_LOW = const(6)
+_PROTO_FIELDS = const(7)
+
+PROTOCOLS = array('H', (0, 0, 0, 0, 0, 0, 0,
+                        350, 1, 31, 1, 3, 3, 1,
+                        650, 1, 10, 1, 2, 2, 1,
+                        100, 30, 71, 4, 11, 9, 6,
+                        380, 1, 6, 1, 3, 3, 1,
+                        500, 6, 14, 1, 2, 2, 1,
+                        200, 1, 10, 1, 5, 1, 1))
+
+"""RP2040 single-cycle GPIO set/clear registers"""
+_SIO_GPIO_OUT_SET = const(0xd0000014)
+_SIO_GPIO_OUT_CLR = const(0xd0000018)
+
+@micropython.viper
+def _sw_pulse(mask: int, t: int, high: int, low: int) -> int:
+    """Play one high/low pulse on the masked pin, returns the next deadline.
+
+    Edges are single-cycle SIO register writes instead of Pin method
+    calls, and each edge is gated by a busy-wait on an absolute ticks_us
+    deadline — sleep_us rounds up by tens of usec on MicroPython and the
+    deadline chain keeps per-pulse error from accumulating as drift."""
+    ptr32(_SIO_GPIO_OUT_SET)[0] = mask
+    t = int(utime.ticks_add(t, high))
+    while int(utime.ticks_diff(t, utime.ticks_us())) > 0:
+        pass
+    ptr32(_SIO_GPIO_OUT_CLR)[0] = mask
+    t = int(utime.ticks_add(t, low))
+    while int(utime.ticks_diff(t, utime.ticks_us())) > 0:
+        pass
+    return t
+
+@rp2.asm_pio(set_init=rp2.PIO.OUT_LOW, out_shiftdir=rp2.PIO.SHIFT_RIGHT)
+def _tx_pulse():
+    """Play one pulse per FIFO word, low 16 bits high-ticks, upper 16 bits low-ticks.
+    One PIO tick is SCALE_TIME_US usec, so counts are pulses * pulselength.
+    Feeding pulses through the FIFO keeps the CPU free during the repeats,
+    a DMA-driven PWM slice could do the same but needs a (top, duty) rewrite
+    per pulse, the PIO program stays the simpler of the two."""
+    pull(block)
+    out(x, 16)
+    out(y, 16)
+    set(pins, 1)
+    label("high")
+    jmp(x_dec, "high")
+    set(pins, 0)
+    label("low")
+    jmp(y_dec, "low")
+
+class RFDevice:
+    """Representation of a GPIO RF device."""
+
+    # pylint: disable=too-many-instance-attributes,too-many-arguments
+    def __init__(self, gpio,
+                 tx_proto=1, tx_pulselength=None, tx_repeat=10, tx_length=24, rx_tolerance=70):
+        """Initialize the RF device."""
+        self.gpio = gpio
+        self.tx_enabled = False
+        self.tx_proto = tx_proto
+        if tx_pulselength:
+            self.tx_pulselength = tx_pulselength
+        else:
+            self.tx_pulselength = PROTOCOLS[tx_proto * _PROTO_FIELDS + _PULSELEN]
+        self.tx_repeat = tx_repeat
+        self.tx_length = tx_length
+        self.rx_enabled = False
+        self.rx_tolerance = rx_tolerance
+        # internal values
+        self._sm = None
+        self._tx_cache = {}
+        self._rx_timings = array('H', [0] * (MAX_CHANGES + 1))
+        self._rx_bits = bytearray(MAX_CHANGES // 2)
+        self._rx_last_timestamp = 0
+        self._rx_repeat_count = 0
+        # edge ring buffer, the ISR produces at head, _rx_drain consumes
+        self._rx_ring = array('H', [0] * _RX_RING_SIZE)
+        self._rx_head = 0
+        self._rx_tail = 0
+        self._rx_frame_at = 0
+        self._rx_frame_len = 0
+        self._rx_pending = False
+        self._rx_drain_ref = self._rx_drain
+        # successful RX values
+        self.rx_code = None
+        self.rx_code_timestamp = None
+        self.rx_proto = tx_proto
+        self.rx_repeat = tx_repeat
+        self.rx_bitlength = None
+        self.rx_pulselength = None
+
+        if _DEBUG:
+            print("Using GPIO " + str(gpio))
+
+    def cleanup(self):
+        """Disable TX and RX and clean up GPIO."""
+        if self.tx_enabled:
+            self.disable_tx()
+        if self.rx_enabled:
+            self.disable_rx()
+        if _DEBUG:
+            print("Cleanup pin")
+        Pin(self.gpio, Pin.IN, Pin.PULL_DOWN)
+
+    def enable_tx(self):
+        """Enable TX, set up GPIO."""
+        if self.rx_enabled:
+            if _DEBUG:
+                print("RX is enabled, not enabling TX")
+            return False
+        if not 0 < self.tx_proto < len(PROTOCOLS) // _PROTO_FIELDS:
+            if _DEBUG:
+                print("Unknown TX protocol")
+            return False
+        if not self.tx_enabled:
+            self.tx_enabled = True
+            if _DEBUG:
+                print(self.gpio)
+            # hoist the protocol fields once, the TX loops read these
+            base = self.tx_proto * _PROTO_FIELDS
+            self._pulse_zero = (PROTOCOLS[base + _ZERO_HIGH], PROTOCOLS[base + _ZERO_LOW])
+            self._pulse_one = (PROTOCOLS[base + _ONE_HIGH], PROTOCOLS[base + _ONE_LOW])
+            self._pulse_sync = (PROTOCOLS[base + _SYNC_HIGH], PROTOCOLS[base + _SYNC_LOW])
+            pl = self.tx_pulselength
+            self._sync_word = (PROTOCOLS[base + _SYNC_LOW] * pl) << 16 | (PROTOCOLS[base + _SYNC_HIGH] * pl)
+            self._unit = self.tx_pulselength * SCALE_TIME_US
+            self.tx_pin = Pin(self.gpio, Pin.OUT)
+            self._gpio_mask = 1 << self.gpio
+            try:
+                self._sm = rp2.StateMachine(0, _tx_pulse,
+                                            freq=1_000_000 // SCALE_TIME_US,
+                                            set_base=self.tx_pin)
+                self._sm.active(1)
+            except (ValueError, OSError):
+                # no free state machine, keep the bit-banged fallback
+                self._sm = None
+            if _DEBUG:
+                print("TX enabled")
+        return True
+
+    def disable_tx(self):
+        """Disable TX, reset GPIO."""
+        if self.tx_enabled:
+            if self._sm:
+                self._sm.active(0)
+                self._sm = None
+            # set up GPIO pin as input for safety
+            self.tx_pin = Pin(self.gpio, Pin.IN, Pin.PULL_DOWN)
+            self.tx_enabled = False
+            if _DEBUG:
+                print("TX disabled")
+        return True
+
+    def tx_code(self, code):
+        """
+        Send a decimal code.
+
+        """
+        if not self._sm:
+            return self._tx_int(*self._tx_expand(code))
+        key = (code, self.tx_proto)
+        buf = self._tx_cache.get(key)
+        if buf is None:
+            buf = self._tx_pulses(*self._tx_expand(code))
+            self._tx_cache[key] = buf
+        if self.tx_proto == 6:
+            # one leading sync, the trailing sync of each frame delimits the rest
+            self._sm.put(self._sync_word)
+        for _ in range(0, self.tx_repeat):
+            self._sm.put(buf)
+        return True
+
+    def _tx_expand(self, code):
+        """Expand a code to the on-air bits, returns (code, bitcount)."""
+        if self.tx_proto == 6:
+            # Manchester: bit b becomes the pair b+1, i.e. 0 -> 01, 1 -> 10
+            length = self.tx_length
+            manchester = 0
+            for i in range(0, length):
+                manchester |= (((code >> i) & 1) + 1) << (2 * i)
+            return manchester, 2 * length
+        return code, self.tx_length
+
+    def tx_bin(self, rawcode):
+        """Send a binary code."""
+        return self._tx_int(int(rawcode, 2), len(rawcode))
+
+    def _tx_int(self, code, length):
+        """Send `length` bits of an integer code."""
+        if not self.tx_enabled:
+            if _DEBUG:
+                print("TX is not enabled, not sending data")
+            return False
+        if self._sm:
+            buf = self._tx_pulses(code, length)
+            if self.tx_proto == 6:
+                self._sm.put(self._sync_word)
+            for _ in range(0, self.tx_repeat):
+                self._sm.put(buf)
+            return True
+        zh, zl = self._pulse_zero
+        oh, ol = self._pulse_one
+        sh, sl = self._pulse_sync
+        unit = self._unit
+        zh, zl = zh * unit, zl * unit
+        oh, ol = oh * unit, ol * unit
+        sh, sl = sh * unit, sl * unit
+        mask = self._gpio_mask
+        # one absolute deadline carried across the whole transmission,
+        # one leading sync, each frame's trailing sync delimits the rest
+        t = utime.ticks_us()
+        if self.tx_proto == 6:
+            t = _sw_pulse(mask, t, sh, sl)
+        for _ in range(0, self.tx_repeat):
+            for i in range(length - 1, -1, -1):
+                if (code >> i) & 1:
+                    t = _sw_pulse(mask, t, oh, ol)
+                else:
+                    t = _sw_pulse(mask, t, zh, zl)
+            t = _sw_pulse(mask, t, sh, sl)
+        return True
+
+    def _tx_pulses(self, code, length):
+        """Pack one frame (bits + trailing sync) into PIO tick counts."""
+        pl = self.tx_pulselength
+        zh, zl = self._pulse_zero
+        oh, ol = self._pulse_one
+        sh, sl = self._pulse_sync
+        sync = (sl * pl) << 16 | (sh * pl)
+        zero = (zl * pl) << 16 | (zh * pl)
+        one = (ol * pl) << 16 | (oh * pl)
+        buf = array('I')
+        for i in range(length - 1, -1, -1):
+            if (code >> i) & 1:
+                buf.append(one)
+            else:
+                buf.append(zero)
+        buf.append(sync)
+        return buf
+
+    def enable_rx(self):
+        """Enable RX, set up GPIO and add event detection."""
+        if self.tx_enabled:
+            if _DEBUG:
+                print("TX is enabled, not enabling RX")
+            return False
+        if not self.rx_enabled:
+            self.rx_enabled = True
+            self.rx_pin = Pin(self.gpio, Pin.IN, Pin.PULL_DOWN)
+            self.rx_pin.irq(trigger=Pin.IRQ_FALLING|Pin.IRQ_RISING, handler=self.rx_callback)
+            if _DEBUG:
+                print("RX enabled")
+        return True
+
+    def disable_rx(self):
+        """Disable RX, remove GPIO event detection."""
+        if self.rx_enabled:
+            self.rx_pin.irq(handler=None)
+            self.rx_enabled = False
+            if _DEBUG:
+                print("RX disabled")
+        return True
+    
+    def received_rx(self):
+        code = self.rx_code 
+        if self.rx_code:
+            self.rx_code = None
+        return code
+
+    @micropython.native
+    def rx_callback(self, rx_pin):
+        """RX callback for GPIO event detection. Capture edge timings only,
+        decoding runs in _rx_drain outside interrupt context."""
+        timestamp = utime.ticks_us()
+        duration = utime.ticks_diff(timestamp, self._rx_last_timestamp)
+
+        """Ignoring pulses shorter than THRESHOLD_TICK"""
+        if duration > THRESHOLD_TICK:
+            if _DEBUG_RX:
+                machine.mem32[_SIO_GPIO_OUT_XOR] = _DEBUG1_MASK
+            head = self._rx_head
+            """Synchronizing to a pulse longer than THRESHOLD_SYNC"""
+            if duration > THRESHOLD_SYNC:
+                if _DEBUG_RX:
+                    machine.mem32[_SIO_GPIO_OUT_XOR] = _DEBUG2_MASK
+                self._rx_repeat_count += 1
+                count = (head - self._rx_tail) & _RX_RING_MASK
+                if 2 < count <= MAX_CHANGES and not self._rx_pending:
+                    self._rx_pending = True
+                    self._rx_frame_at = self._rx_tail
+                    self._rx_frame_len = count
+                    try:
+                        micropython.schedule(self._rx_drain_ref, timestamp)
+                    except RuntimeError:
+                        self._rx_pending = False
+                self._rx_tail = head
+
+            # timings are array('H'), clamp idle gaps to the field width
+            if duration > 0xFFFF:
+                duration = 0xFFFF
+            self._rx_ring[head] = duration
+            self._rx_head = (head + 1) & _RX_RING_MASK
+
+        self._rx_last_timestamp = timestamp
+
+    def _rx_drain(self, timestamp):
+        """Copy a captured frame out of the ring and decode it at task priority."""
+        ring = self._rx_ring
+        timings = self._rx_timings
+        start = self._rx_frame_at
+        count = self._rx_frame_len
+        # pulse pairs land 32-bit aligned, the sync gap travels separately
+        sync = ring[start]
+        for i in range(1, count):
+            timings[i - 1] = ring[(start + i) & _RX_RING_MASK]
+        self._rx_pending = False
+
+        #print("Changes:", count)
+        #print("Buffer:", timings)
+        npairs = (count - 2) // 2
+        if count > 7 and self._rx_waveform(self.rx_proto, sync, npairs):
+            bits = self._rx_bits
+            code = 0
+            for k in range(0, npairs):
+                code = code << 1 | bits[k]
+            if code != 0:
+                self.rx_code = code
+                self.rx_code_timestamp = timestamp
+
+    @micropython.viper
+    def _rx_waveform(self, pnum: int, sync: int, npairs: int) -> bool:
+        """Classify the pulse pairs against the protocol timings.
+
+        Bit values land in _rx_bits, the code itself is assembled by
+        _rx_drain — a viper int is 32-bit signed, so accumulating long
+        codes here would turn 32-bit codes negative."""
+        # pairs start at index 0 now, one 32-bit load fetches high and low
+        pairs = ptr32(self._rx_timings)
+        bits = ptr8(self._rx_bits)
+        proto = ptr16(PROTOCOLS)
+        base = pnum * _PROTO_FIELDS
+        delay = sync // proto[base + _SYNC_LOW]
+        #print("Defined pulsewidth", delay)
+        tol = (delay * int(self.rx_tolerance)) // 100
+        ntol = 0 - tol  # unary minus on viper ints breaks pre-v1.20 firmware
+        # expected timings, computed once instead of per pulse pair
+        ezh = delay * proto[base + _ZERO_HIGH]
+        ezl = delay * proto[base + _ZERO_LOW]
+        eoh = delay * proto[base + _ONE_HIGH]
+        eol = delay * proto[base + _ONE_LOW]
+
+        for k in range(0, npairs):
+            w = pairs[k]
+            h = w & 0xFFFF
+            l = (w >> 16) & 0xFFFF
+            dh = h - ezh
+            dl = l - ezl
+            if ntol < dh and dh < tol and ntol < dl and dl < tol:
+                bits[k] = 0
+            else:
+                dh = h - eoh
+                dl = l - eol
+                if ntol < dh and dh < tol and ntol < dl and dl < tol:
+                    bits[k] = 1
+                else:
+                    return False
+
+        return True